@@ -0,0 +1,78 @@
+"""
+Redis cache - shared connection pool, best effort (Redis is optional)
+"""
+import logging
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[redis.Redis] = None
+
+# Redis is optional: report it being down once a minute, not on every request
+FAILURE_LOG_INTERVAL = 60  # seconds
+_last_failure_log = float("-inf")
+
+
+def _log_failure(op: str, key, e: RedisError):
+    global _last_failure_log
+    now = time.monotonic()
+    if now - _last_failure_log >= FAILURE_LOG_INTERVAL:
+        _last_failure_log = now
+        logger.warning("Redis %s %s failed (cache bypassed): %s", op, key, e)
+    else:
+        logger.debug("Redis %s %s failed: %s", op, key, e)
+
+
+def get_redis() -> redis.Redis:
+    """Get or create the shared Redis client (pooled connections)"""
+    global _client
+    if _client is None:
+        pool = redis.ConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=32,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+            decode_responses=True,
+        )
+        _client = redis.Redis(connection_pool=pool)
+    return _client
+
+
+async def close_redis():
+    """Close the shared client (app shutdown)"""
+    global _client
+    if _client is not None:
+        # Pool was passed in explicitly, so it isn't closed by default
+        await _client.aclose(close_connection_pool=True)
+        _client = None
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """GET a key, None on miss or if Redis is unavailable"""
+    try:
+        return await get_redis().get(key)
+    except RedisError as e:
+        _log_failure("GET", key, e)
+        return None
+
+
+async def cache_set(key: str, value, ttl: int):
+    """SET a key with a TTL in seconds, ignored if Redis is unavailable"""
+    try:
+        await get_redis().set(key, value, ex=ttl)
+    except RedisError as e:
+        _log_failure("SET", key, e)
+
+
+async def cache_delete(*keys: str):
+    """DEL keys, ignored if Redis is unavailable"""
+    try:
+        await get_redis().delete(*keys)
+    except RedisError as e:
+        _log_failure("DEL", keys, e)
@@ -0,0 +1,18 @@
+"""
+Clock helpers - cached calendar values for hot paths
+"""
+import time
+from datetime import datetime
+
+_current_year = datetime.now().year
+_current_year_at = time.monotonic()
+
+
+def current_year() -> int:
+    """Current year, re-read from the clock at most once an hour"""
+    global _current_year, _current_year_at
+    now = time.monotonic()
+    if now - _current_year_at > 3600:
+        _current_year = datetime.now().year
+        _current_year_at = now
+    return _current_year
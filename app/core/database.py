@@ -1,6 +1,8 @@
 """
 Database connection and session management
 """
+import asyncio
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
@@ -8,11 +10,22 @@ from app.core.config import settings
 # Convert sync URL to async
 DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
 
-engine = create_async_engine(DATABASE_URL, echo=settings.DEBUG)
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.DEBUG,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    # Short OLTP queries: JIT compilation costs more than it saves
+    connect_args={"server_settings": {"jit": "off"}},
+)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
+# Upper bound for the `limit` query param of list endpoints
+MAX_PAGE_SIZE = 500
+
 
 async def init_db():
     """Initialize database tables"""
@@ -20,6 +33,14 @@ async def init_db():
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def warm_db_pool():
+    """Open pool_size connections up front so first requests skip connection setup"""
+    async def _connect():
+        async with engine.connect():
+            pass
+    await asyncio.gather(*(_connect() for _ in range(settings.DB_POOL_SIZE)))
+
+
 async def get_db():
     """Dependency for getting DB session"""
     async with async_session() as session:
@@ -0,0 +1,33 @@
+"""
+Shared HTTP client - one keep-alive connection pool for outbound API calls
+"""
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared AsyncClient (HTTP/2, pooled connections)"""
+    global _client
+    if _client is None:
+        # Also used for user-supplied URLs: never keep cookies, or one user's
+        # cookies from host X would be replayed on another user's request to X
+        no_cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        _client = httpx.AsyncClient(
+            cookies=no_cookies,
+            timeout=httpx.Timeout(60.0),
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client (app shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
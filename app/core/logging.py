@@ -0,0 +1,37 @@
+"""
+Logging setup - records are queued, a background thread does the I/O
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Optional
+
+from app.core.config import settings
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """Route root logging through a QueueHandler so emitting never blocks on stderr"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+    
+    # Per-request INFO lines from the HTTP client would log every outbound call,
+    # including user-supplied download URLs (which may carry signed tokens)
+    for name in ("httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
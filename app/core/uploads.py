@@ -0,0 +1,22 @@
+"""
+Upload helpers - bounded reads of multipart files
+"""
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+
+
+async def read_upload_capped(file: UploadFile, max_bytes: int, detail: str) -> bytes:
+    """Read an upload in chunks, raising 413 as soon as it exceeds max_bytes"""
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail=detail)
+    
+    buf = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        buf.extend(chunk)
+        if len(buf) > max_bytes:
+            raise HTTPException(status_code=413, detail=detail)
+    return bytes(buf)
@@ -4,10 +4,18 @@ Consolidates: auth, gateway, billing, subscription, crm, email, notification
 """
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.logging import setup_logging
+
+# Before the module imports below, which may log at import time
+setup_logging()
+
+from app.core.cache import close_redis
+from app.core.database import init_db, warm_db_pool
+from app.core.http import close_http_client
 from app.modules.auth.router import router as auth_router
 from app.modules.billing.router import router as billing_router
 from app.modules.subscription.router import router as subscription_router
@@ -24,16 +32,19 @@ from app.modules.vehicle.router import router as vehicle_router
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    await warm_db_pool()
     yield
     # Shutdown
-    pass
+    await close_http_client()
+    await close_redis()
 
 
 app = FastAPI(
     title="Keroxio API",
     description="Plateforme d'aide à la vente automobile",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS
@@ -4,12 +4,17 @@ Billing module - Stripe payments
 from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional
+import asyncio
+import logging
 import stripe
 
+from app.core.cache import cache_delete
 from app.core.config import settings
 from app.core.security import get_current_user
+from app.modules.subscription.router import subscription_cache_key
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Initialize Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
@@ -36,7 +41,8 @@ async def create_checkout_session(
         raise HTTPException(status_code=503, detail="Stripe not configured")
     
     try:
-        session = stripe.checkout.Session.create(
+        session = await asyncio.to_thread(
+            stripe.checkout.Session.create,
             payment_method_types=["card"],
             line_items=[{"price": data.price_id, "quantity": 1}],
             mode="subscription",
@@ -60,7 +66,8 @@ async def create_payment_intent(
         raise HTTPException(status_code=503, detail="Stripe not configured")
     
     try:
-        intent = stripe.PaymentIntent.create(
+        intent = await asyncio.to_thread(
+            stripe.PaymentIntent.create,
             amount=data.amount,
             currency=data.currency,
             metadata={"user_id": current_user["id"]}
@@ -92,16 +99,18 @@ async def stripe_webhook(request: Request):
     if event["type"] == "checkout.session.completed":
         session = event["data"]["object"]
         # TODO: Update user subscription status
-        print(f"Checkout completed for user: {session.get('client_reference_id')}")
+        logger.info("Checkout completed for user: %s", session.get("client_reference_id"))
+        if session.get("client_reference_id"):
+            await cache_delete(subscription_cache_key(session["client_reference_id"]))
     
     elif event["type"] == "invoice.paid":
         invoice = event["data"]["object"]
-        print(f"Invoice paid: {invoice['id']}")
+        logger.info("Invoice paid: %s", invoice["id"])
     
     elif event["type"] == "customer.subscription.deleted":
         subscription = event["data"]["object"]
         # TODO: Cancel user subscription
-        print(f"Subscription cancelled: {subscription['id']}")
+        logger.info("Subscription cancelled: %s", subscription["id"])
     
     return {"status": "success"}
 
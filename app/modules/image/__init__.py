@@ -7,6 +7,8 @@ Features:
 - Pipeline complet remove-bg + composite
 """
 
+import logging
+
 from .router import router
 
 # Initialize default backgrounds at import
@@ -14,6 +16,6 @@ try:
     from .init_backgrounds import init
     init()
 except Exception as e:
-    print(f"[Image] Warning: Could not initialize backgrounds: {e}")
+    logging.getLogger(__name__).warning("Could not initialize backgrounds: %s", e)
 
 __all__ = ["router"]
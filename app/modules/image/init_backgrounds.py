@@ -2,8 +2,11 @@
 Background initialization - disabled (using custom uploads only).
 """
 
+import logging
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 
 def create_default_backgrounds(bg_dir: Path):
     """Disabled - backgrounds are uploaded manually."""
@@ -15,5 +18,5 @@ def init():
     """Initialize backgrounds directory (no defaults)."""
     bg_dir = Path(__file__).parent / "backgrounds_images"
     bg_dir.mkdir(parents=True, exist_ok=True)
-    print("[Image] Backgrounds directory ready (no defaults - upload your own)")
+    logger.info("Backgrounds directory ready (no defaults - upload your own)")
     return 0
@@ -6,6 +6,7 @@ Endpoints:
 - POST /remove-bg : Supprime l'arrière-plan → PNG transparent
 - POST /composite : Fusionne voiture + background
 - POST /process : Pipeline complet (remove-bg + composite)
+- POST /process/batch : Pipeline complet sur plusieurs images
 - GET /backgrounds : Liste les backgrounds disponibles
 - POST /backgrounds : Ajoute un nouveau background
 - GET /health : Status du service
@@ -13,10 +14,11 @@ Endpoints:
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from fastapi.responses import Response, FileResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 import io
 
+from app.core.uploads import read_upload_capped
 from .service import get_image_service
 
 router = APIRouter(prefix="/image", tags=["Image Processing"])
@@ -51,6 +53,14 @@ class ProcessRequest(BaseModel):
     vertical_offset: float = 0.0  # -0.1 to 0.1 (negative = lower)
 
 
+class ProcessBatchRequest(BaseModel):
+    image_urls: List[str] = Field(..., min_length=1, max_length=20)
+    background: str
+    position: str = "center"
+    scale: float = 0.0  # 0 = auto (recommended), 0.3-0.7 = manual
+    vertical_offset: float = 0.0  # -0.1 to 0.1 (negative = lower)
+
+
 class ProcessResponse(BaseModel):
     id: str
     status: str
@@ -83,7 +93,7 @@ async def health():
     
     # Check if remove.bg API key is configured
     from app.core.config import settings
-    removebg_configured = bool(getattr(settings, 'REMOVEBG_API_KEY', None))
+    removebg_configured = bool(settings.REMOVEBG_API_KEY)
     
     backgrounds = service.list_backgrounds()
     
@@ -118,9 +128,9 @@ async def add_background(
     if file.content_type not in ["image/jpeg", "image/png", "image/webp"]:
         raise HTTPException(400, "Format non supporté. Utilisez JPEG, PNG ou WebP.")
     
-    content = await file.read()
-    if len(content) > 20 * 1024 * 1024:
-        raise HTTPException(413, "Image trop grande (max 20MB)")
+    content = await read_upload_capped(
+        file, 20 * 1024 * 1024, "Image trop grande (max 20MB)"
+    )
     
     service = get_image_service()
     try:
@@ -140,30 +150,8 @@ async def remove_background(request: RemoveBgRequest):
     service = get_image_service()
     
     try:
-        # Download image
         image_bytes = await service.download_image(request.image_url)
-        
-        # Remove background
-        import time
-        import uuid
-        start = time.time()
-        request_id = str(uuid.uuid4())
-        
-        transparent = await service.remove_background(image_bytes)
-        
-        # Save result
-        from pathlib import Path
-        filename = f"{request_id}_transparent.png"
-        filepath = service.storage_path / "processed" / filename
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        filepath.write_bytes(transparent)
-        
-        return {
-            "id": request_id,
-            "status": "completed",
-            "transparent_url": f"{service.api_url}/image/files/{filename}",
-            "processing_time": round(time.time() - start, 2),
-        }
+        return await service.remove_background_to_file(image_bytes)
     except Exception as e:
         raise HTTPException(500, str(e))
 
@@ -180,9 +168,9 @@ async def remove_background_upload(
     if file.content_type not in ["image/jpeg", "image/png", "image/webp"]:
         raise HTTPException(400, "Format non supporté. Utilisez JPEG, PNG ou WebP.")
     
-    content = await file.read()
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(413, "Image trop grande (max 10MB)")
+    content = await read_upload_capped(
+        file, 10 * 1024 * 1024, "Image trop grande (max 10MB)"
+    )
     
     service = get_image_service()
     try:
@@ -211,35 +199,14 @@ async def composite(request: CompositeRequest):
     service = get_image_service()
     
     try:
-        # Download car PNG
         car_bytes = await service.download_image(request.car_url)
-        
-        # Composite
-        import time
-        import uuid
-        start = time.time()
-        request_id = str(uuid.uuid4())
-        
-        result = await service.composite(
+        return await service.composite_to_file(
             car_bytes,
             request.background,
             position=request.position,
             scale=request.scale,
+            vertical_offset=request.vertical_offset,
         )
-        
-        # Save result
-        filename = f"{request_id}_final.jpg"
-        filepath = service.storage_path / "processed" / filename
-        filepath.parent.mkdir(parents=True, exist_ok=True)
-        filepath.write_bytes(result)
-        
-        return {
-            "id": request_id,
-            "status": "completed",
-            "final_url": f"{service.api_url}/image/files/{filename}",
-            "background": request.background,
-            "processing_time": round(time.time() - start, 2),
-        }
     except Exception as e:
         raise HTTPException(500, str(e))
 
@@ -279,6 +246,30 @@ async def process_image(request: ProcessRequest):
         raise HTTPException(500, str(e))
 
 
+@router.post("/process/batch")
+async def process_image_batch(request: ProcessBatchRequest):
+    """
+    Pipeline complet sur plusieurs images (max 20), traitées en parallèle.
+    
+    Chaque résultat a le format de /process, ou status "failed" + error
+    si cette image a échoué.
+    """
+    service = get_image_service()
+    
+    results = await service.process_batch(
+        request.image_urls,
+        request.background,
+        position=request.position,
+        scale=request.scale,
+        vertical_offset=request.vertical_offset,
+    )
+    
+    return {
+        "results": results,
+        "count": len(results),
+    }
+
+
 @router.post("/process/upload", response_model=ProcessResponse)
 async def process_image_upload(
     file: UploadFile = File(...),
@@ -296,9 +287,9 @@ async def process_image_upload(
     if file.content_type not in ["image/jpeg", "image/png", "image/webp"]:
         raise HTTPException(400, "Format non supporté. Utilisez JPEG, PNG ou WebP.")
     
-    content = await file.read()
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(413, "Image trop grande (max 10MB)")
+    content = await read_upload_capped(
+        file, 10 * 1024 * 1024, "Image trop grande (max 10MB)"
+    )
     
     service = get_image_service()
     try:
@@ -344,9 +335,9 @@ async def mask_plate(
     if file.content_type not in ["image/jpeg", "image/png", "image/webp"]:
         raise HTTPException(400, "Format non supporté. Utilisez JPEG, PNG ou WebP.")
     
-    content = await file.read()
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(413, "Image trop grande (max 10MB)")
+    content = await read_upload_capped(
+        file, 10 * 1024 * 1024, "Image trop grande (max 10MB)"
+    )
     
     # Clamp blur strength
     blur_strength = max(10, min(50, blur_strength))
@@ -370,7 +361,7 @@ async def mask_plate(
 async def get_processed_file(filename: str):
     """Récupère un fichier traité."""
     service = get_image_service()
-    filepath = service.storage_path / "processed" / filename
+    filepath = service.processed_path(filename)
     
     if not filepath.exists():
         raise HTTPException(404, "File not found")
@@ -378,10 +369,12 @@ async def get_processed_file(filename: str):
     # Determine media type
     media_type = "image/png" if filename.endswith(".png") else "image/jpeg"
     
+    # Processed files are never rewritten (content-hash names)
     return FileResponse(
         path=filepath,
         media_type=media_type,
         filename=filename,
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
     )
 
 
@@ -401,8 +394,10 @@ async def get_background_file(filename: str):
     
     media_type = "image/png" if filename.endswith(".png") else "image/jpeg"
     
+    # Static, but add_background can replace a name: cache, not immutable
     return FileResponse(
         path=filepath,
         media_type=media_type,
         filename=filename,
+        headers={"Cache-Control": "public, max-age=3600"},
     )
@@ -3,31 +3,85 @@ Service de traitement d'images Keroxio.
 Option B: Remove-bg + Composite local avec Pillow.
 """
 
+import aiofiles
+import aiofiles.os
 import asyncio
+import hashlib
 import httpx
 import io
+import logging
+import orjson
+import secrets
 import time
 import uuid
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from PIL import Image
 
 from app.core.config import settings
+from app.core.http import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# OpenCV (SIMD) for resize/blur, Pillow fallback if not installed
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+
+# Backgrounds only change via add_background (or a redeploy)
+BACKGROUNDS_CACHE_TTL = 300  # seconds
+
+# Images fetched by URL are streamed and capped at this size
+MAX_DOWNLOAD_SIZE = 20 * 1024 * 1024
+
+# Remove-bg results kept per input hash (entries point at files in processed/)
+REMOVE_BG_CACHE_SIZE = 1024
+
+# process_batch: images in flight at once (download + remove-bg + composite)
+BATCH_CONCURRENCY = 4
+
+# remove.bg: retry rate limits / server errors / failed connects, fail fast on other 4xx.
+# Read timeouts are not retried: the call is paid and not idempotent.
+REMOVE_BG_MAX_ATTEMPTS = 3
+REMOVE_BG_RETRY_DELAY = 1.0  # seconds, doubled on each attempt
+REMOVE_BG_MAX_RETRY_AFTER = 10  # seconds, cap on a server-sent Retry-After
+REMOVE_BG_RETRY_STATUSES = (408, 425, 429)
 
 
 class ImageService:
     """Service principal pour le traitement d'images."""
     
     def __init__(self):
-        self.storage_path = Path(getattr(settings, 'STORAGE_PATH', '/tmp/storage'))
+        self.storage_path = Path(settings.STORAGE_PATH)
         # Use API URL for serving processed files directly
         self.api_url = "https://api.keroxio.fr"
+        self.processed_base_url = settings.PROCESSED_URL.rstrip("/")
         self.backgrounds_path = Path(__file__).parent / "backgrounds_images"
+        self._backgrounds_cache: Optional[List[Dict[str, Any]]] = None
+        self._backgrounds_cache_at = 0.0
+        self._remove_bg_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._remove_bg_inflight: Dict[str, "asyncio.Future[Tuple[bytes, str, asyncio.Future]]"] = {}
+        
+        # API auth headers, built once instead of per call
+        self._removebg_headers = {"X-Api-Key": settings.REMOVEBG_API_KEY}
+        self._plate_recognizer_headers = {
+            "Authorization": f"Token {settings.PLATE_RECOGNIZER_API_KEY}"
+        }
         
         # Create directories
         self.storage_path.mkdir(parents=True, exist_ok=True)
         (self.storage_path / "processed").mkdir(exist_ok=True)
         
+        if not self.processed_base_url:
+            logger.warning(
+                "PROCESSED_URL not set: processed images are served by the API "
+                "(/image/files); serve %s/processed with nginx or a CDN instead",
+                self.storage_path,
+            )
+        
     # ========== REMOVE BACKGROUND ==========
     
     async def remove_background(
@@ -43,22 +97,111 @@ class ImageService:
             method: "rembg" (local) ou "removebg" (API)
             
         Returns:
-            PNG avec fond transparent
+            PNG avec fond transparent (non sauvegardé, voir remove_background_saved)
+        """
+        method, cache_key = self._remove_bg_key(image_bytes, method)
+        
+        # Same image already processed: reuse the saved PNG, skip the API call
+        cached = await self._get_cached_remove_bg(cache_key)
+        if cached is not None:
+            return cached[0]
+        
+        return await self._run_remove_bg(image_bytes, method)
+    
+    async def remove_background_saved(
+        self,
+        image_bytes: bytes,
+        method: str = "auto",
+    ) -> Tuple[bytes, str]:
+        """
+        Supprime l'arrière-plan et sauvegarde le PNG dans processed/.
+        
+        Returns:
+            (PNG avec fond transparent, nom du fichier dans processed/)
         """
-        # Auto-select best available method
+        result, filename, write = await self._remove_background_pending(image_bytes, method)
+        if write is not None:
+            await asyncio.shield(write)
+        return result, filename
+    
+    async def _remove_background_pending(
+        self,
+        image_bytes: bytes,
+        method: str = "auto",
+    ) -> Tuple[bytes, str, Optional[asyncio.Future]]:
+        """Like remove_background_saved, but the PNG write may still be in
+        flight: returns it as a future (None if already on disk) so callers
+        can overlap it with other work."""
+        method, cache_key = self._remove_bg_key(image_bytes, method)
+        
+        cached = await self._get_cached_remove_bg(cache_key)
+        if cached is not None:
+            return (*cached, None)
+        
+        # Same image already being processed (or written): share that call
+        task = self._remove_bg_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._remove_bg_and_save(image_bytes, method, cache_key))
+            self._remove_bg_inflight[cache_key] = task
+        return await asyncio.shield(task)
+    
+    async def _remove_bg_and_save(
+        self,
+        image_bytes: bytes,
+        method: str,
+        cache_key: str,
+    ) -> Tuple[bytes, str, asyncio.Future]:
+        try:
+            result = await self._run_remove_bg(image_bytes, method)
+        except BaseException:
+            self._remove_bg_inflight.pop(cache_key, None)
+            raise
+        
+        # Name is known from the content: start the write, don't wait for it
+        filename = self._processed_filename(result, "png")
+        write = asyncio.ensure_future(self._write_and_remember(cache_key, filename, result))
+        return result, filename, write
+    
+    async def _write_and_remember(self, cache_key: str, filename: str, data: bytes):
+        """Write a remove-bg result, then record it in the LRU (and end its in-flight entry)."""
+        try:
+            await self._write_processed(filename, data)
+            self._remove_bg_cache[cache_key] = filename
+            if len(self._remove_bg_cache) > REMOVE_BG_CACHE_SIZE:
+                self._remove_bg_cache.popitem(last=False)
+        finally:
+            self._remove_bg_inflight.pop(cache_key, None)
+    
+    def _remove_bg_key(self, image_bytes: bytes, method: str) -> Tuple[str, str]:
+        """Resolve "auto" and build the result cache key (method + input hash)."""
         if method == "auto":
-            api_key = getattr(settings, 'REMOVEBG_API_KEY', None)
-            if api_key:
-                method = "removebg"
-            else:
-                method = "rembg"
+            method = "removebg" if settings.REMOVEBG_API_KEY else "rembg"
+        
+        if method not in ("removebg", "rembg"):
+            raise ValueError(f"Unknown method: {method}")
         
+        return method, f"{method}:{hashlib.blake2b(image_bytes, digest_size=16).hexdigest()}"
+    
+    async def _run_remove_bg(self, image_bytes: bytes, method: str) -> bytes:
         if method == "removebg":
             return await self._remove_bg_api(image_bytes)
-        elif method == "rembg":
-            return await self._remove_bg_rembg(image_bytes)
-        else:
-            raise ValueError(f"Unknown method: {method}")
+        return await self._remove_bg_rembg(image_bytes)
+    
+    async def _get_cached_remove_bg(self, cache_key: str) -> Optional[Tuple[bytes, str]]:
+        """Read a cached remove-bg result back from processed/ (LRU)."""
+        filename = self._remove_bg_cache.get(cache_key)
+        if filename is None:
+            return None
+        try:
+            async with aiofiles.open(self.processed_path(filename), "rb") as f:
+                data = await f.read()
+        except FileNotFoundError:
+            self._remove_bg_cache.pop(cache_key, None)
+            return None
+        # The entry may have been evicted by another request during the read
+        if cache_key in self._remove_bg_cache:
+            self._remove_bg_cache.move_to_end(cache_key)
+        return data, filename
     
     async def _remove_bg_rembg(self, image_bytes: bytes) -> bytes:
         """Remove background using rembg (local ML model)."""
@@ -77,22 +220,42 @@ class ImageService:
     
     async def _remove_bg_api(self, image_bytes: bytes) -> bytes:
         """Remove background using remove.bg API."""
-        api_key = getattr(settings, 'REMOVEBG_API_KEY', None)
-        if not api_key:
+        if not settings.REMOVEBG_API_KEY:
             raise ValueError("REMOVEBG_API_KEY not configured")
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                "https://api.remove.bg/v1.0/removebg",
-                files={"image_file": ("image.jpg", image_bytes, "image/jpeg")},
-                data={"size": "auto"},
-                headers={"X-Api-Key": api_key},
-            )
-            
-            if response.status_code != 200:
-                raise ValueError(f"remove.bg API error: {response.text}")
+        delay = REMOVE_BG_RETRY_DELAY
+        for attempt in range(1, REMOVE_BG_MAX_ATTEMPTS + 1):
+            last = attempt == REMOVE_BG_MAX_ATTEMPTS
+            wait = delay
+            try:
+                response = await get_http_client().post(
+                    "https://api.remove.bg/v1.0/removebg",
+                    files={"image_file": ("image.jpg", image_bytes, "image/jpeg")},
+                    data={"size": "auto"},
+                    headers=self._removebg_headers,
+                    timeout=60.0,
+                )
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if last:
+                    raise ValueError(f"remove.bg API unreachable: {e}")
+                logger.warning("remove.bg request failed (attempt %d): %s", attempt, e)
+            else:
+                if response.status_code == 200:
+                    return response.content
+                
+                code = response.status_code
+                transient = code >= 500 or code in REMOVE_BG_RETRY_STATUSES
+                if last or not transient:
+                    raise ValueError(f"remove.bg API error: {response.text}")
+                
+                retry_after = response.headers.get("Retry-After", "")
+                if retry_after.isdigit():
+                    # Applies to this wait only; the backoff base keeps doubling
+                    wait = min(int(retry_after), REMOVE_BG_MAX_RETRY_AFTER)
+                logger.warning("remove.bg returned %d (attempt %d), retrying in %.1fs", code, attempt, wait)
             
-            return response.content
+            await asyncio.sleep(wait)
+            delay *= 2
     
     # ========== COMPOSITE ==========
     
@@ -103,7 +266,7 @@ class ImageService:
         position: str = "center",
         scale: float = 0.85,
         vertical_offset: float = 0.0,
-    ) -> bytes:
+    ) -> str:
         """
         Compose une voiture (PNG transparent) sur un background.
         
@@ -115,7 +278,7 @@ class ImageService:
             vertical_offset: Décalage vertical (-0.1 à 0.1, négatif = plus bas)
             
         Returns:
-            Image JPG finale
+            Nom du fichier JPG final dans processed/
         """
         # Load car image
         car_img = Image.open(io.BytesIO(car_bytes)).convert("RGBA")
@@ -125,7 +288,9 @@ class ImageService:
         if not bg_path.exists():
             raise ValueError(f"Background not found: {background_name}")
         
-        bg_img = Image.open(bg_path).convert("RGBA")
+        # Background is freshly loaded, so paste onto it directly: no copy,
+        # and loading as RGB avoids an RGBA round-trip before the JPEG encode
+        bg_img = Image.open(bg_path).convert("RGB")
         
         # Resize car to fit background
         car_img = self._resize_car(car_img, bg_img.size, scale)
@@ -133,15 +298,50 @@ class ImageService:
         # Calculate position
         x, y = self._calculate_position(car_img.size, bg_img.size, position, vertical_offset)
         
-        # Composite
-        result = bg_img.copy()
-        result.paste(car_img, (x, y), car_img)
+        # Composite (car alpha as mask)
+        self._alpha_blend(bg_img, car_img, x, y)
         
-        # Convert to RGB (no alpha) and save as JPG
-        result_rgb = result.convert("RGB")
+        # Encode once, then hash/write the buffer without copying it
         output = io.BytesIO()
-        result_rgb.save(output, format="JPEG", quality=92)
-        return output.getvalue()
+        bg_img.save(output, format="JPEG", quality=92)
+        return await self._save_processed(output.getbuffer(), "jpg")
+    
+    def _alpha_blend(
+        self,
+        background: Image.Image,
+        car: Image.Image,
+        x: int,
+        y: int,
+    ) -> None:
+        """Blend an RGBA car onto an RGB background in place.
+        
+        I = aF + (1-a)B in uint16 numpy arithmetic, restricted to the
+        car's on-canvas rectangle (car may overflow the edges).
+        """
+        # Fast paths: nothing visible, or no soft edges to blend
+        alpha_min, alpha_max = car.getchannel("A").getextrema()
+        if alpha_max == 0:
+            return
+        if alpha_min == 255:
+            background.paste(car.convert("RGB"), (x, y))
+            return
+        
+        if cv2 is None:
+            background.paste(car, (x, y), car)
+            return
+        
+        bg_w, bg_h = background.size
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + car.width, bg_w), min(y + car.height, bg_h)
+        if x1 <= x0 or y1 <= y0:
+            return
+        
+        fg = np.asarray(car)[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = np.asarray(background.crop((x0, y0, x1, y1)), dtype=np.uint16)
+        alpha = fg[..., 3:4].astype(np.uint16)
+        blended = (fg[..., :3] * alpha + roi * (255 - alpha) + 127) // 255
+        
+        background.paste(Image.fromarray(blended.astype(np.uint8), "RGB"), (x0, y0))
     
     def _get_background_path(self, name: str) -> Path:
         """Get background image path by name."""
@@ -198,7 +398,7 @@ class ImageService:
                 target_h = int(bg_h * 0.30)
                 ratio = target_h / car_h
                 target_w = int(car_w * ratio)
-                return car.resize((target_w, target_h), Image.Resampling.LANCZOS)
+                return self._resize(car, (target_w, target_h))
             else:
                 # Square-ish (3/4 view) - balanced at ~38%
                 scale = 0.38
@@ -214,7 +414,34 @@ class ImageService:
             ratio = target_h / car_h
             target_w = int(car_w * ratio)
         
-        return car.resize((target_w, target_h), Image.Resampling.LANCZOS)
+        return self._resize(car, (target_w, target_h))
+    
+    def _resize(self, img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        """Resize RGBA: OpenCV si disponible, sinon Pillow LANCZOS.
+        
+        OpenCV works on premultiplied alpha (like Pillow) to avoid dark
+        fringes, and uses INTER_AREA when shrinking since its LANCZOS4
+        kernel is fixed-size and aliases on large downscales.
+        """
+        if cv2 is None or img.mode != "RGBA":
+            return img.resize(size, Image.Resampling.LANCZOS)
+        
+        arr = np.asarray(img.convert("RGBa"))
+        interpolation = cv2.INTER_AREA if size[0] < img.width else cv2.INTER_LANCZOS4
+        out = cv2.resize(arr, size, interpolation=interpolation)
+        return Image.frombuffer("RGBa", size, out, "raw", "RGBa", 0, 1).convert("RGBA")
+    
+    def _blur(self, img: Image.Image, radius: float) -> Image.Image:
+        """Gaussian blur: OpenCV si disponible, sinon Pillow."""
+        if cv2 is None or img.mode not in ("RGB", "L"):
+            from PIL import ImageFilter
+            return img.filter(ImageFilter.GaussianBlur(radius))
+        
+        # Pillow's radius is the standard deviation; replicate edges like Pillow
+        out = cv2.GaussianBlur(
+            np.asarray(img), (0, 0), sigmaX=radius, borderType=cv2.BORDER_REPLICATE
+        )
+        return Image.fromarray(out, img.mode)
     
     def _calculate_position(
         self,
@@ -250,6 +477,94 @@ class ImageService:
     
     # ========== FULL PROCESS ==========
     
+    def processed_path(self, filename: str) -> Path:
+        """Chemin disque d'un fichier traité."""
+        return self.storage_path / "processed" / filename
+    
+    def processed_url(self, filename: str) -> str:
+        """URL publique d'un fichier traité (nginx/CDN si PROCESSED_URL est défini)."""
+        if self.processed_base_url:
+            return f"{self.processed_base_url}/{filename}"
+        return f"{self.api_url}/image/files/{filename}"
+    
+    async def _save_processed(self, data, ext: str) -> str:
+        """Sauvegarde dans processed/ sous un nom dérivé du contenu.
+        
+        Identical outputs map to the same immutable file, so repeats skip
+        the write and browsers/CDN can cache the URL forever.
+        """
+        filename = self._processed_filename(data, ext)
+        await self._write_processed(filename, data)
+        return filename
+    
+    def _processed_filename(self, data, ext: str) -> str:
+        return f"{hashlib.blake2b(data, digest_size=16).hexdigest()}.{ext}"
+    
+    async def _write_processed(self, filename: str, data):
+        path = self.processed_path(filename)
+        if not await aiofiles.os.path.exists(path):
+            # Write then rename so a concurrent reader never sees a partial file;
+            # aiofiles runs the syscalls off the event loop
+            tmp_path = path.with_name(f"{filename}.{secrets.token_hex(8)}.tmp")
+            async with aiofiles.open(tmp_path, "wb") as f:
+                await f.write(data)
+            await aiofiles.os.replace(tmp_path, path)
+    
+    async def remove_background_to_file(
+        self,
+        image_bytes: bytes,
+    ) -> Dict[str, Any]:
+        """
+        Remove-bg seul, résultat sauvegardé dans processed/.
+        
+        Returns:
+            Dict avec l'URL du PNG transparent
+        """
+        start = time.time()
+        request_id = str(uuid.uuid4())
+        
+        _, filename = await self.remove_background_saved(image_bytes)
+        
+        return {
+            "id": request_id,
+            "status": "completed",
+            "transparent_url": self.processed_url(filename),
+            "processing_time": round(time.time() - start, 2),
+        }
+    
+    async def composite_to_file(
+        self,
+        car_bytes: bytes,
+        background_name: str,
+        position: str = "center",
+        scale: float = 0.85,
+        vertical_offset: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Composite seul, résultat sauvegardé dans processed/.
+        
+        Returns:
+            Dict avec l'URL de l'image finale
+        """
+        start = time.time()
+        request_id = str(uuid.uuid4())
+        
+        filename = await self.composite(
+            car_bytes,
+            background_name,
+            position=position,
+            scale=scale,
+            vertical_offset=vertical_offset,
+        )
+        
+        return {
+            "id": request_id,
+            "status": "completed",
+            "final_url": self.processed_url(filename),
+            "background": background_name,
+            "processing_time": round(time.time() - start, 2),
+        }
+    
     async def process_image(
         self,
         image_bytes: bytes,
@@ -269,43 +584,93 @@ class ImageService:
         request_id = str(uuid.uuid4())
         
         # Step 1: Remove background
-        car_transparent = await self.remove_background(
+        car_transparent, transparent_filename, write = await self._remove_background_pending(
             image_bytes,
             method=remove_bg_method,
         )
         
-        # Save transparent version
-        transparent_filename = f"{request_id}_transparent.png"
-        transparent_path = self.storage_path / "processed" / transparent_filename
-        transparent_path.write_bytes(car_transparent)
-        
-        # Step 2: Composite with background
-        final_image = await self.composite(
+        # Step 2: Composite with background, while the transparent
+        # version is written to disk (independent, overlapped)
+        composite = self.composite(
             car_transparent,
             background_name,
             position=position,
             scale=scale,
             vertical_offset=vertical_offset,
         )
-        
-        # Save final version
-        final_filename = f"{request_id}_final.jpg"
-        final_path = self.storage_path / "processed" / final_filename
-        final_path.write_bytes(final_image)
+        if write is None:
+            final_filename = await composite
+        else:
+            _, final_filename = await asyncio.gather(asyncio.shield(write), composite)
         
         return {
             "id": request_id,
             "status": "completed",
-            "transparent_url": f"{self.api_url}/image/files/{transparent_filename}",
-            "final_url": f"{self.api_url}/image/files/{final_filename}",
+            "transparent_url": self.processed_url(transparent_filename),
+            "final_url": self.processed_url(final_filename),
             "background": background_name,
             "processing_time": round(time.time() - start, 2),
         }
     
+    async def process_batch(
+        self,
+        image_urls: List[str],
+        background_name: str,
+        position: str = "center",
+        scale: float = 0.85,
+        vertical_offset: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Pipeline complet sur plusieurs images.
+        
+        Images are processed concurrently, at most BATCH_CONCURRENCY at a
+        time; a repeated URL is processed once. A failure only affects its
+        own entry.
+        
+        Returns:
+            Liste de dicts (format process_image), dans l'ordre des URLs
+        """
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        
+        async def process_one(url: str) -> Dict[str, Any]:
+            async with semaphore:
+                image_bytes = await self.download_image(url)
+                return await self.process_image(
+                    image_bytes,
+                    background_name,
+                    position=position,
+                    scale=scale,
+                    vertical_offset=vertical_offset,
+                )
+        
+        unique_urls = list(dict.fromkeys(image_urls))
+        results = await asyncio.gather(
+            *(process_one(url) for url in unique_urls),
+            return_exceptions=True,
+        )
+        by_url = dict(zip(unique_urls, results))
+        
+        return [
+            {"status": "failed", "image_url": url, "error": str(by_url[url])}
+            if isinstance(by_url[url], Exception) else by_url[url]
+            for url in image_urls
+        ]
+    
     # ========== BACKGROUNDS MANAGEMENT ==========
     
     def list_backgrounds(self) -> List[Dict[str, Any]]:
-        """Liste les backgrounds disponibles."""
+        """Liste les backgrounds disponibles (cache BACKGROUNDS_CACHE_TTL)."""
+        now = time.monotonic()
+        if (
+            self._backgrounds_cache is None
+            or now - self._backgrounds_cache_at > BACKGROUNDS_CACHE_TTL
+        ):
+            self._backgrounds_cache = self._scan_backgrounds()
+            self._backgrounds_cache_at = now
+        return self._backgrounds_cache
+    
+    def _scan_backgrounds(self) -> List[Dict[str, Any]]:
+        """Parcourt les dossiers de backgrounds."""
         backgrounds = []
         
         # Check backgrounds_images folder
@@ -354,6 +719,7 @@ class ImageService:
         # Convert and save as JPG
         img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
         img.save(filepath, format="JPEG", quality=95)
+        self._backgrounds_cache = None
         
         return {
             "name": name,
@@ -378,33 +744,28 @@ class ImageService:
         Returns:
             Image avec plaque floutée en bytes (JPEG)
         """
-        from PIL import ImageFilter
-        import os
-        import base64
-        
-        api_key = os.getenv("PLATE_RECOGNIZER_API_KEY", "")
-        if not api_key:
+        if not settings.PLATE_RECOGNIZER_API_KEY:
             raise ValueError("Plate Recognizer API key not configured")
         
         # Call Plate Recognizer to get plate bounding box
-        image_b64 = base64.b64encode(image_bytes).decode()
+        # Raw bytes as multipart (no base64: -33% payload, no str copy)
+        response = await get_http_client().post(
+            "https://api.platerecognizer.com/v1/plate-reader/",
+            headers=self._plate_recognizer_headers,
+            files={"upload": ("plate.jpg", image_bytes, "image/jpeg")},
+            data={"regions": "fr"},
+            timeout=30.0,
+        )
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                "https://api.platerecognizer.com/v1/plate-reader/",
-                headers={"Authorization": f"Token {api_key}"},
-                data={"upload": image_b64, "regions": "fr"}
-            )
-            
-            if response.status_code not in [200, 201]:
-                raise ValueError(f"Plate detection failed: {response.status_code}")
-            
-            data = response.json()
-            results = data.get("results", [])
-            
-            if not results:
-                # No plate found, return original
-                return image_bytes
+        if response.status_code not in [200, 201]:
+            raise ValueError(f"Plate detection failed: {response.status_code}")
+        
+        data = orjson.loads(response.content)
+        results = data.get("results", [])
+        
+        if not results:
+            # No plate found, return original
+            return image_bytes
         
         # Open image with Pillow
         img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
@@ -422,7 +783,7 @@ class ImageService:
                 plate_region = img.crop((xmin, ymin, xmax, ymax))
                 
                 # Apply gaussian blur
-                blurred = plate_region.filter(ImageFilter.GaussianBlur(blur_strength))
+                blurred = self._blur(plate_region, blur_strength)
                 
                 # Paste back
                 img.paste(blurred, (xmin, ymin))
@@ -435,11 +796,20 @@ class ImageService:
     # ========== UTILITIES ==========
     
     async def download_image(self, url: str) -> bytes:
-        """Download image from URL."""
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url)
+        """Download image from URL (streamed, capped at MAX_DOWNLOAD_SIZE)."""
+        too_large = f"Image trop grande (max {MAX_DOWNLOAD_SIZE // (1024 * 1024)}MB)"
+        
+        async with get_http_client().stream("GET", url, timeout=30.0) as response:
             response.raise_for_status()
-            return response.content
+            if int(response.headers.get("content-length", 0)) > MAX_DOWNLOAD_SIZE:
+                raise ValueError(too_large)
+            
+            buf = bytearray()
+            async for chunk in response.aiter_bytes(1 << 16):
+                buf.extend(chunk)
+                if len(buf) > MAX_DOWNLOAD_SIZE:
+                    raise ValueError(too_large)
+            return bytes(buf)
     
     def get_image_info(self, image_bytes: bytes) -> Dict[str, Any]:
         """Get image metadata."""
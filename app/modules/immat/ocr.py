@@ -1,12 +1,15 @@
 """OCR module - License plate recognition using Plate Recognizer API"""
 import httpx
-import base64
-import os
+import orjson
 from typing import Optional
 from pydantic import BaseModel
 
-PLATE_RECOGNIZER_API_KEY = os.getenv("PLATE_RECOGNIZER_API_KEY", "")
+from app.core.config import settings
+from app.core.http import get_http_client
+
+PLATE_RECOGNIZER_API_KEY = settings.PLATE_RECOGNIZER_API_KEY
 PLATE_RECOGNIZER_URL = "https://api.platerecognizer.com/v1/plate-reader/"
+PLATE_RECOGNIZER_HEADERS = {"Authorization": f"Token {PLATE_RECOGNIZER_API_KEY}"}
 
 class PlateOCRResult(BaseModel):
     success: bool
@@ -33,63 +36,61 @@ async def read_plate_from_image(image_bytes: bytes) -> PlateOCRResult:
         )
     
     try:
-        # Encode image as base64
-        image_b64 = base64.b64encode(image_bytes).decode()
+        # Send raw bytes as multipart (no base64 inflation)
+        response = await get_http_client().post(
+            PLATE_RECOGNIZER_URL,
+            headers=PLATE_RECOGNIZER_HEADERS,
+            files={
+                "upload": ("plate.jpg", image_bytes, "image/jpeg")
+            },
+            data={
+                "regions": "fr"  # Optimize for French plates
+            },
+            timeout=30.0,
+        )
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                PLATE_RECOGNIZER_URL,
-                headers={
-                    "Authorization": f"Token {PLATE_RECOGNIZER_API_KEY}"
-                },
-                data={
-                    "upload": image_b64,
-                    "regions": "fr"  # Optimize for French plates
-                }
+        if response.status_code == 403:
+            return PlateOCRResult(
+                success=False,
+                error="Invalid API key or quota exceeded"
             )
-            
-            if response.status_code == 403:
-                return PlateOCRResult(
-                    success=False,
-                    error="Invalid API key or quota exceeded"
-                )
-            
-            if response.status_code != 200 and response.status_code != 201:
-                return PlateOCRResult(
-                    success=False,
-                    error=f"API error: {response.status_code}"
-                )
-            
-            data = response.json()
-            
-            # Check if any plates were found
-            results = data.get("results", [])
-            if not results:
-                return PlateOCRResult(
-                    success=False,
-                    error="No license plate detected in image"
-                )
-            
-            # Get the first (best) result
-            best = results[0]
-            plate = best.get("plate", "").upper()
-            score = best.get("score", 0)
-            
-            # Get region info
-            region_info = best.get("region", {})
-            region_code = region_info.get("code", "")
-            
-            # Get vehicle info if available
-            vehicle = best.get("vehicle", {})
-            vehicle_type = vehicle.get("type", "")
-            
+        
+        if response.status_code != 200 and response.status_code != 201:
+            return PlateOCRResult(
+                success=False,
+                error=f"API error: {response.status_code}"
+            )
+        
+        data = orjson.loads(response.content)
+        
+        # Check if any plates were found
+        results = data.get("results", [])
+        if not results:
             return PlateOCRResult(
-                success=True,
-                plate=plate,
-                confidence=round(score, 3),
-                region=region_code,
-                vehicle_type=vehicle_type
+                success=False,
+                error="No license plate detected in image"
             )
+        
+        # Get the first (best) result
+        best = results[0]
+        plate = best.get("plate", "").upper()
+        score = best.get("score", 0)
+        
+        # Get region info
+        region_info = best.get("region", {})
+        region_code = region_info.get("code", "")
+        
+        # Get vehicle info if available
+        vehicle = best.get("vehicle", {})
+        vehicle_type = vehicle.get("type", "")
+        
+        return PlateOCRResult(
+            success=True,
+            plate=plate,
+            confidence=round(score, 3),
+            region=region_code,
+            vehicle_type=vehicle_type
+        )
             
     except httpx.RequestError as e:
         return PlateOCRResult(
@@ -2,15 +2,17 @@
 from fastapi import APIRouter, HTTPException, Path, UploadFile, File
 from pydantic import BaseModel, Field
 from typing import Optional
-from datetime import datetime
+from functools import lru_cache
 import re
-import os
 
+from app.core.clock import current_year
+from app.core.config import settings
+from app.core.uploads import read_upload_capped
 from .ocr import read_plate_from_image, PlateOCRResult
 
 router = APIRouter()
 
-PLATE_RECOGNIZER_API_KEY = os.getenv("PLATE_RECOGNIZER_API_KEY", "")
+PLATE_RECOGNIZER_API_KEY = settings.PLATE_RECOGNIZER_API_KEY
 
 # === Schemas ===
 class VehicleInfo(BaseModel):
@@ -30,27 +32,38 @@ class LookupResponse(BaseModel):
     error: Optional[str] = None
 
 # === Helpers ===
+_OLD_PLATE_RE = re.compile(r'^\d{1,4}[A-Z]{1,3}\d{2,3}$')
+_YEAR_PLATE_RE = re.compile(r'^([A-Z]{2})-?\d{3}-?[A-Z]{2}$')
+_PLATE_STRIP = str.maketrans("", "", " -")
+# A-Z -> "L", 0-9 -> "D": one C-level pass yields the plate's shape
+_PLATE_SHAPE = str.maketrans(
+    {**{chr(c): "L" for c in range(ord("A"), ord("Z") + 1)},
+     **{chr(c): "D" for c in range(ord("0"), ord("9") + 1)}}
+)
+
+@lru_cache(maxsize=4096)
 def validate_plate(plaque: str) -> str:
     """Validate and normalize French plate"""
-    plaque = plaque.upper().replace(" ", "").replace("-", "")
+    plaque = plaque.upper().translate(_PLATE_STRIP)
     
-    # New format: AA-123-BB
-    if re.match(r'^[A-Z]{2}\d{3}[A-Z]{2}$', plaque):
+    # New format: AA-123-BB (shape check, no regex)
+    if len(plaque) == 7 and plaque.translate(_PLATE_SHAPE) == "LLDDDLL":
         return f"{plaque[:2]}-{plaque[2:5]}-{plaque[5:]}"
     
     # Old format: 123 ABC 75
-    if re.match(r'^\d{1,4}[A-Z]{1,3}\d{2,3}$', plaque):
+    if _OLD_PLATE_RE.match(plaque):
         return plaque
     
     raise ValueError("Format de plaque invalide")
 
 def estimate_year_from_plate(plaque: str) -> Optional[int]:
     """Estimate registration year from new format plate"""
-    match = re.match(r'^([A-Z]{2})-?\d{3}-?[A-Z]{2}$', plaque)
+    # Not memoized: the result depends on the current year
+    match = _YEAR_PLATE_RE.match(plaque)
     if match:
         first_letter = match.group(1)[0]
         year = 2009 + (ord(first_letter) - ord('A')) * 2
-        if year <= datetime.now().year:
+        if year <= current_year():
             return year
     return None
 
@@ -115,9 +128,9 @@ async def ocr_plate(file: UploadFile = File(...)):
     Returns detected plate number with confidence score.
     """
     # Validate file size
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="Image too large (max 10MB)")
+    contents = await read_upload_capped(
+        file, 10 * 1024 * 1024, "Image too large (max 10MB)"
+    )
     
     # Call OCR
     result = await read_plate_from_image(contents)
@@ -129,9 +142,9 @@ async def ocr_and_lookup(file: UploadFile = File(...)):
     Read license plate from image AND look up vehicle info.
     Combines OCR + vehicle lookup in one call.
     """
-    contents = await file.read()
-    if len(contents) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=413, detail="Image too large (max 10MB)")
+    contents = await read_upload_capped(
+        file, 10 * 1024 * 1024, "Image too large (max 10MB)"
+    )
     
     # OCR first
     ocr_result = await read_plate_from_image(contents)
@@ -1,7 +1,7 @@
 """
 Notification models
 """
-from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Text, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -12,11 +12,26 @@ from app.core.database import Base
 class Notification(Base):
     __tablename__ = "notifications"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    # Python defaults are what the app sends; the server defaults cover raw SQL
+    # inserts (and only exist on tables created by create_all after this change)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=text("gen_random_uuid()"))
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     title = Column(String, nullable=False)
     message = Column(Text, nullable=False)
     type = Column(String, default="info")  # info, success, warning, error
     read = Column(Boolean, default=False)
     link = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=text("timezone('utc', now())"), nullable=False)
+
+
+# "Unread for user X, newest first": seek + pre-sorted rows, no sort step.
+# Leading user_id also serves plain per-user lookups (replaces its own index).
+# INCLUDE id makes the unread COUNT(id) an index-only scan; title/message are
+# left out (unbounded text would bloat the index and can exceed its row limit).
+Index(
+    "ix_notif_user_read_created",
+    Notification.user_id,
+    Notification.read,
+    Notification.created_at.desc(),
+    postgresql_include=["id"],
+)
@@ -1,19 +1,27 @@
 """
 Notification module - in-app notifications
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from pydantic import BaseModel
+from sqlalchemy import delete, insert, select, update
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.cache import cache_delete, cache_get, cache_set
+from app.core.database import MAX_PAGE_SIZE, get_db
 from app.core.security import get_current_user
 from app.modules.notification.models import Notification
 
 router = APIRouter()
 
+# Unread count is polled by the UIs; cached per user, dropped on every change
+UNREAD_COUNT_TTL = 60  # seconds
+
+
+def _unread_key(user_id) -> str:
+    return f"notif:unread:{user_id}"
+
 
 class NotificationCreate(BaseModel):
     user_id: str
@@ -23,6 +31,10 @@ class NotificationCreate(BaseModel):
     link: Optional[str] = None
 
 
+class NotificationBulkCreate(BaseModel):
+    notifications: List[NotificationCreate] = Field(..., min_length=1, max_length=1000)
+
+
 class NotificationResponse(BaseModel):
     id: str
     title: str
@@ -34,12 +46,17 @@ class NotificationResponse(BaseModel):
     
     class Config:
         from_attributes = True
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def _id_to_str(cls, v):
+        return str(v)
 
 
 @router.get("/", response_model=List[NotificationResponse])
 async def list_notifications(
     unread_only: bool = False,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -61,6 +78,10 @@ async def get_unread_count(
     db: AsyncSession = Depends(get_db)
 ):
     """Get count of unread notifications"""
+    cached = await cache_get(_unread_key(current_user["id"]))
+    if cached is not None:
+        return {"unread": int(cached)}
+    
     from sqlalchemy import func
     result = await db.execute(
         select(func.count(Notification.id))
@@ -68,6 +89,7 @@ async def get_unread_count(
         .where(Notification.read == False)
     )
     count = result.scalar()
+    await cache_set(_unread_key(current_user["id"]), count, UNREAD_COUNT_TTL)
     return {"unread": count}
 
 
@@ -79,17 +101,18 @@ async def mark_as_read(
 ):
     """Mark a notification as read"""
     result = await db.execute(
-        select(Notification)
+        update(Notification)
         .where(Notification.id == notification_id)
         .where(Notification.user_id == current_user["id"])
+        .values(read=True)
+        .returning(Notification.id)
     )
-    notification = result.scalar_one_or_none()
     
-    if not notification:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    notification.read = True
     await db.commit()
+    await cache_delete(_unread_key(current_user["id"]))
     return {"message": "Marked as read"}
 
 
@@ -106,6 +129,7 @@ async def mark_all_as_read(
         .values(read=True)
     )
     await db.commit()
+    await cache_delete(_unread_key(current_user["id"]))
     return {"message": "All notifications marked as read"}
 
 
@@ -119,13 +143,38 @@ async def create_notification(
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    notification = Notification(**notif_data.model_dump())
-    db.add(notification)
+    # INSERT ... RETURNING: id/created_at come back with the row, no refresh
+    result = await db.execute(
+        insert(Notification).values(**notif_data.model_dump()).returning(Notification)
+    )
+    notification = result.scalar_one()
     await db.commit()
-    await db.refresh(notification)
+    await cache_delete(_unread_key(notification.user_id))
     return notification
 
 
+@router.post("/bulk")
+async def create_notifications_bulk(
+    data: NotificationBulkCreate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many notifications in one INSERT (admin/system only)"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    rows = [n.model_dump() for n in data.notifications]
+    result = await db.execute(
+        insert(Notification).values(rows).returning(Notification.id, Notification.user_id)
+    )
+    created = result.all()
+    await db.commit()
+    
+    # Keys from the stored UUIDs, not the client's strings (case/dash variants)
+    await cache_delete(*{_unread_key(user_id) for _, user_id in created})
+    return {"created": len(created), "ids": [str(notif_id) for notif_id, _ in created]}
+
+
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: str,
@@ -134,15 +183,15 @@ async def delete_notification(
 ):
     """Delete a notification"""
     result = await db.execute(
-        select(Notification)
+        delete(Notification)
         .where(Notification.id == notification_id)
         .where(Notification.user_id == current_user["id"])
+        .returning(Notification.id)
     )
-    notification = result.scalar_one_or_none()
     
-    if not notification:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    await db.delete(notification)
     await db.commit()
+    await cache_delete(_unread_key(current_user["id"]))
     return {"message": "Notification deleted"}
@@ -2,7 +2,10 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+import bisect
+import numpy as np
+
+from app.core.clock import current_year
 
 router = APIRouter()
 
@@ -16,6 +19,9 @@ class EstimationRequest(BaseModel):
     transmission: Optional[str] = None
     condition: Optional[str] = "good"
 
+class BatchEstimationRequest(BaseModel):
+    vehicles: List[EstimationRequest] = Field(..., min_length=1, max_length=1000)
+
 class EstimationResponse(BaseModel):
     estimated_price: int
     price_min: int
@@ -32,27 +38,33 @@ BRAND_TIERS = {
     "economy": ["dacia", "fiat", "seat", "opel", "citroen", "peugeot", "renault", "nissan"],
 }
 
+TIER_BASE_PRICES = {"premium": 45000, "mid": 32000, "economy": 25000}
+DEFAULT_BASE_PRICE = 28000
+
 DEPRECIATION = {0: 1.0, 1: 0.80, 2: 0.70, 3: 0.60, 4: 0.52, 5: 0.45, 
                 6: 0.40, 7: 0.35, 8: 0.31, 9: 0.28, 10: 0.25, 15: 0.15, 20: 0.10}
 
+FUEL_MULTIPLIERS = {"electric": 1.15, "hybrid": 1.08, "diesel": 0.95}
+CONDITION_MULTIPLIERS = {"excellent": 1.10, "good": 1.0, "fair": 0.90, "poor": 0.75}
+
+# Lookups derived once at import
+_BRAND_TO_BASE = {b: TIER_BASE_PRICES[t] for t, bs in BRAND_TIERS.items() for b in bs}
+_DEP_AGES = sorted(DEPRECIATION)
+_DEP_VALS = [DEPRECIATION[a] for a in _DEP_AGES]
+
 def get_base_price(brand: str, model: str) -> int:
-    brand_lower = brand.lower()
-    for tier, brands in BRAND_TIERS.items():
-        if brand_lower in brands:
-            return {"premium": 45000, "mid": 32000, "economy": 25000}[tier]
-    return 28000
+    return _BRAND_TO_BASE.get(brand.lower(), DEFAULT_BASE_PRICE)
 
 def get_depreciation(age: int) -> float:
     if age <= 0: return 1.0
     if age >= 20: return 0.10
-    for a in sorted(DEPRECIATION.keys(), reverse=True):
-        if age >= a: return DEPRECIATION[a]
-    return 0.10
+    return _DEP_VALS[bisect.bisect_right(_DEP_AGES, age) - 1]
 
 def estimate_price(req: EstimationRequest) -> dict:
-    age = datetime.now().year - req.year
+    age = current_year() - req.year
     base = get_base_price(req.brand, req.model)
-    price = base * get_depreciation(age)
+    dep = get_depreciation(age)
+    price = base * dep
     
     # Mileage adjustment
     expected_km = age * 15000
@@ -60,13 +72,11 @@ def estimate_price(req: EstimationRequest) -> dict:
     price *= max(0.7, min(1.15, 1.0 - km_diff * 0.02))
     
     # Fuel adjustment
-    fuel_mult = {"electric": 1.15, "hybrid": 1.08, "diesel": 0.95}.get(
-        (req.fuel_type or "").lower(), 1.0)
+    fuel_mult = FUEL_MULTIPLIERS.get((req.fuel_type or "").lower(), 1.0)
     price *= fuel_mult
     
     # Condition
-    cond_mult = {"excellent": 1.10, "good": 1.0, "fair": 0.90, "poor": 0.75}.get(
-        (req.condition or "good").lower(), 1.0)
+    cond_mult = CONDITION_MULTIPLIERS.get((req.condition or "good").lower(), 1.0)
     price *= cond_mult
     
     price = round(price / 100) * 100
@@ -76,10 +86,51 @@ def estimate_price(req: EstimationRequest) -> dict:
         "price_max": int(price * 1.08),
         "confidence": 0.80,
         "market_position": "average",
-        "factors": {"base_price": base, "age": age, "depreciation": round((1-get_depreciation(age))*100, 1)},
+        "factors": {"base_price": base, "age": age, "depreciation": round((1-dep)*100, 1)},
         "recommendations": ["Prix cohérent avec le marché"]
     }
 
+# === Batch engine (same formula as estimate_price, as array ops) ===
+# Each lookup table ends with the default used for unknown keys
+_BRAND_CODES = {b: i for i, b in enumerate(_BRAND_TO_BASE)}
+_BASE_LUT = np.array([*_BRAND_TO_BASE.values(), DEFAULT_BASE_PRICE], dtype=np.float64)
+_FUEL_CODES = {f: i for i, f in enumerate(FUEL_MULTIPLIERS)}
+_FUEL_LUT = np.array([*FUEL_MULTIPLIERS.values(), 1.0])
+_COND_CODES = {c: i for i, c in enumerate(CONDITION_MULTIPLIERS)}
+_COND_LUT = np.array([*CONDITION_MULTIPLIERS.values(), 1.0])
+_DEP_LUT = np.array([get_depreciation(a) for a in range(21)])
+
+def estimate_prices_batch(reqs: List[EstimationRequest]) -> List[dict]:
+    n = len(reqs)
+    ages = current_year() - np.fromiter((r.year for r in reqs), dtype=np.int64, count=n)
+    mileages = np.fromiter((r.mileage for r in reqs), dtype=np.float64, count=n)
+    brands = np.fromiter(
+        (_BRAND_CODES.get(r.brand.lower(), len(_BRAND_CODES)) for r in reqs), dtype=np.intp, count=n)
+    fuels = np.fromiter(
+        (_FUEL_CODES.get((r.fuel_type or "").lower(), len(_FUEL_CODES)) for r in reqs), dtype=np.intp, count=n)
+    conds = np.fromiter(
+        (_COND_CODES.get((r.condition or "good").lower(), len(_COND_CODES)) for r in reqs), dtype=np.intp, count=n)
+    
+    base = _BASE_LUT[brands]
+    dep = _DEP_LUT[np.clip(ages, 0, 20)]
+    km_diff = (mileages - ages * 15000) / 10000
+    price = base * dep * np.clip(1.0 - km_diff * 0.02, 0.7, 1.15) * _FUEL_LUT[fuels] * _COND_LUT[conds]
+    price = np.round(price / 100) * 100
+    
+    depreciation_pct = np.round((1 - dep) * 100, 1)
+    return [
+        {
+            "price": int(p),
+            "price_min": int(p * 0.92),
+            "price_max": int(p * 1.08),
+            "confidence": 0.80,
+            "market_position": "average",
+            "factors": {"base_price": int(b), "age": a, "depreciation": d},
+            "recommendations": ["Prix cohérent avec le marché"]
+        }
+        for p, b, a, d in zip(price.tolist(), base.tolist(), ages.tolist(), depreciation_pct.tolist())
+    ]
+
 # === Endpoints ===
 @router.post("/estimate", response_model=EstimationResponse)
 async def estimate_vehicle(request: EstimationRequest):
@@ -95,6 +146,23 @@ async def estimate_vehicle(request: EstimationRequest):
         recommendations=result["recommendations"]
     )
 
+@router.post("/estimate/batch")
+async def estimate_vehicles_batch(request: BatchEstimationRequest):
+    """Estimate prices for many vehicles at once (up to 1000)"""
+    results = [
+        EstimationResponse(
+            estimated_price=r["price"],
+            price_min=r["price_min"],
+            price_max=r["price_max"],
+            confidence=r["confidence"],
+            market_position=r["market_position"],
+            factors=r["factors"],
+            recommendations=r["recommendations"]
+        )
+        for r in estimate_prices_batch(request.vehicles)
+    ]
+    return {"results": results, "count": len(results)}
+
 @router.get("/brands")
 async def get_brands():
     """Get supported brands"""
@@ -3,21 +3,38 @@ Subscription module - manages user subscriptions
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from pydantic import BaseModel
+from sqlalchemy import select, func, case
+from pydantic import BaseModel, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
+import orjson
 import stripe
 
+from app.core.cache import cache_delete, cache_get, cache_set
 from app.core.database import get_db
 from app.core.config import settings
 from app.core.security import get_current_user
 from app.modules.subscription.models import Subscription
+from app.modules.vehicle.models import Vehicle
 
 router = APIRouter()
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Monthly annonce quota per plan (None = unlimited), see /billing/plans
+PLAN_ANNONCES_LIMITS = {"free": 5, "pro": None, "enterprise": None}
+
+# Usage is recomputed at most this often per user
+USAGE_CACHE_TTL = 60  # seconds
+
+# Current subscription is cached per user, dropped on cancel/resume/checkout
+SUBSCRIPTION_CACHE_TTL = 300  # seconds
+
+
+def subscription_cache_key(user_id) -> str:
+    return f"sub:current:{user_id}"
+
 
 class SubscriptionResponse(BaseModel):
     id: str
@@ -27,6 +44,11 @@ class SubscriptionResponse(BaseModel):
     
     class Config:
         from_attributes = True
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def _id_to_str(cls, v):
+        return str(v)
 
 
 @router.get("/current", response_model=Optional[SubscriptionResponse])
@@ -35,13 +57,22 @@ async def get_current_subscription(
     db: AsyncSession = Depends(get_db)
 ):
     """Get user's current subscription"""
+    cache_key = subscription_cache_key(current_user["id"])
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return orjson.loads(cached)
+    
     result = await db.execute(
         select(Subscription)
         .where(Subscription.user_id == current_user["id"])
         .where(Subscription.status == "active")
     )
     subscription = result.scalar_one_or_none()
-    return subscription
+    
+    # "No active subscription" is cached too (as null)
+    data = SubscriptionResponse.model_validate(subscription).model_dump(mode="json") if subscription else None
+    await cache_set(cache_key, orjson.dumps(data), SUBSCRIPTION_CACHE_TTL)
+    return data
 
 
 @router.get("/usage")
@@ -50,15 +81,53 @@ async def get_usage(
     db: AsyncSession = Depends(get_db)
 ):
     """Get user's usage stats for current billing period"""
-    # TODO: Calculate actual usage from database
-    return {
-        "annonces_created": 3,
-        "annonces_limit": 5,  # Free tier
-        "images_processed": 2,
-        "api_calls": 47,
-        "period_start": "2026-01-01",
-        "period_end": "2026-01-31"
+    user_id = current_user["id"]
+    
+    # Billing period: current calendar month (UTC)
+    now = datetime.utcnow()
+    period_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period_end = (period_start + timedelta(days=32)).replace(day=1)
+    
+    cache_key = f"usage:{user_id}:{period_start:%Y-%m}"
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        return orjson.loads(cached)
+    
+    # All metrics + active plan in one round trip
+    plan = (
+        select(Subscription.plan)
+        .where(Subscription.user_id == user_id)
+        .where(Subscription.status == "active")
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            func.count().filter(Vehicle.status != "draft").label("annonces"),
+            # JSON 'null' (or any non-array) counts as 0 instead of erroring
+            func.coalesce(func.sum(case(
+                (func.json_typeof(Vehicle.photos_traitees) == "array",
+                 func.json_array_length(Vehicle.photos_traitees)),
+                else_=0,
+            )), 0).label("images"),
+            plan.label("plan"),
+        )
+        .where(Vehicle.user_id == user_id)
+        .where(Vehicle.created_at >= period_start)
+        .where(Vehicle.created_at < period_end)
+    )
+    row = result.one()
+    
+    usage = {
+        "annonces_created": row.annonces,
+        "annonces_limit": PLAN_ANNONCES_LIMITS.get(row.plan or "free"),
+        "images_processed": row.images,
+        "api_calls": None,  # not tracked yet
+        "period_start": period_start.date().isoformat(),
+        "period_end": (period_end - timedelta(days=1)).date().isoformat()
     }
+    await cache_set(cache_key, orjson.dumps(usage), USAGE_CACHE_TTL)
+    return usage
 
 
 @router.post("/cancel")
@@ -80,13 +149,14 @@ async def cancel_subscription(
     # Cancel in Stripe
     if subscription.stripe_subscription_id and settings.STRIPE_SECRET_KEY:
         try:
-            stripe.Subscription.delete(subscription.stripe_subscription_id)
+            await asyncio.to_thread(stripe.Subscription.delete, subscription.stripe_subscription_id)
         except stripe.error.StripeError as e:
             raise HTTPException(status_code=400, detail=str(e))
     
     # Update local status
     subscription.status = "cancelled"
     await db.commit()
+    await cache_delete(subscription_cache_key(current_user["id"]))
     
     return {"message": "Subscription cancelled", "ends_at": subscription.current_period_end}
 
@@ -114,7 +184,8 @@ async def resume_subscription(
     # Resume in Stripe
     if subscription.stripe_subscription_id and settings.STRIPE_SECRET_KEY:
         try:
-            stripe.Subscription.modify(
+            await asyncio.to_thread(
+                stripe.Subscription.modify,
                 subscription.stripe_subscription_id,
                 cancel_at_period_end=False
             )
@@ -123,5 +194,6 @@ async def resume_subscription(
     
     subscription.status = "active"
     await db.commit()
+    await cache_delete(subscription_cache_key(current_user["id"]))
     
     return {"message": "Subscription resumed"}
@@ -1,7 +1,7 @@
 """
 Vehicle models - Stockage des véhicules traités par Keroxio
 """
-from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Index, JSON
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from datetime import datetime
 import uuid
@@ -14,7 +14,7 @@ class Vehicle(Base):
     __tablename__ = "vehicles"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Identification
     plaque = Column(String(15), nullable=False, index=True)
@@ -52,3 +52,13 @@ class Vehicle(Base):
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# "Vehicles of user X (with status Y), newest first"; leading user_id also
+# serves plain per-user lookups (replaces its own index).
+Index(
+    "ix_vehicle_user_status_created",
+    Vehicle.user_id,
+    Vehicle.status,
+    Vehicle.created_at.desc(),
+)
@@ -1,14 +1,15 @@
 """
 Vehicle API - CRUD pour les véhicules Keroxio
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
-from pydantic import BaseModel
+from sqlalchemy import delete, insert, select, update, desc, case, cast, func, String, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+from pydantic import BaseModel, field_validator
 from typing import Optional, List
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import MAX_PAGE_SIZE, get_db
 from app.core.security import get_current_user
 from .models import Vehicle
 
@@ -80,6 +81,16 @@ class VehicleResponse(BaseModel):
     
     class Config:
         from_attributes = True
+    
+    @field_validator("id", mode="before")
+    @classmethod
+    def _id_to_str(cls, v):
+        return str(v)
+    
+    @field_validator("photos_originales", "photos_traitees", "published_platforms", mode="before")
+    @classmethod
+    def _none_to_list(cls, v):
+        return v if v is not None else []
 
 
 # ========== ENDPOINTS ==========
@@ -91,7 +102,8 @@ async def create_vehicle(
     db: AsyncSession = Depends(get_db),
 ):
     """Créer un nouveau véhicule."""
-    vehicle = Vehicle(
+    # INSERT ... RETURNING: defaults come back with the row, no refresh
+    result = await db.execute(insert(Vehicle).values(
         user_id=current_user["id"],
         plaque=data.plaque.upper(),
         marque=data.marque,
@@ -103,19 +115,18 @@ async def create_vehicle(
         kilometrage=data.kilometrage,
         couleur=data.couleur,
         puissance=data.puissance,
-    )
-    db.add(vehicle)
+    ).returning(Vehicle))
+    vehicle = result.scalar_one()
     await db.commit()
-    await db.refresh(vehicle)
     
-    return _vehicle_to_response(vehicle)
+    return vehicle
 
 
 @router.get("/", response_model=List[VehicleResponse])
 async def list_vehicles(
     status: Optional[str] = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -128,9 +139,7 @@ async def list_vehicles(
     query = query.order_by(desc(Vehicle.created_at)).offset(offset).limit(limit)
     
     result = await db.execute(query)
-    vehicles = result.scalars().all()
-    
-    return [_vehicle_to_response(v) for v in vehicles]
+    return result.scalars().all()
 
 
 @router.get("/{vehicle_id}", response_model=VehicleResponse)
@@ -151,7 +160,7 @@ async def get_vehicle(
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
-    return _vehicle_to_response(vehicle)
+    return vehicle
 
 
 @router.patch("/{vehicle_id}", response_model=VehicleResponse)
@@ -162,26 +171,28 @@ async def update_vehicle(
     db: AsyncSession = Depends(get_db),
 ):
     """Met à jour un véhicule."""
+    update_data = data.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_vehicle(vehicle_id, current_user, db)
+    
+    # UPDATE ... RETURNING: one round trip, no SELECT beforehand
     result = await db.execute(
-        select(Vehicle).where(
+        update(Vehicle)
+        .where(
             Vehicle.id == vehicle_id,
             Vehicle.user_id == current_user["id"]
         )
+        .values(**update_data)
+        .returning(Vehicle)
     )
     vehicle = result.scalar_one_or_none()
     
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
-    # Update fields
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(vehicle, field, value)
-    
     await db.commit()
-    await db.refresh(vehicle)
     
-    return _vehicle_to_response(vehicle)
+    return vehicle
 
 
 @router.delete("/{vehicle_id}")
@@ -192,17 +203,17 @@ async def delete_vehicle(
 ):
     """Supprime un véhicule."""
     result = await db.execute(
-        select(Vehicle).where(
+        delete(Vehicle)
+        .where(
             Vehicle.id == vehicle_id,
             Vehicle.user_id == current_user["id"]
         )
+        .returning(Vehicle.id)
     )
-    vehicle = result.scalar_one_or_none()
     
-    if not vehicle:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
-    await db.delete(vehicle)
     await db.commit()
     
     return {"message": "Vehicle deleted"}
@@ -216,55 +227,31 @@ async def mark_published(
     db: AsyncSession = Depends(get_db),
 ):
     """Marque le véhicule comme publié sur une plateforme."""
+    # Append in SQL (jsonb @> / ||): one statement, no lost update between
+    # concurrent publishes. The column stays JSON, hence the casts.
+    platforms = func.coalesce(cast(Vehicle.published_platforms, JSONB), func.jsonb_build_array(type_=JSONB))
+    entry = func.jsonb_build_array(cast(platform, String), type_=JSONB)
     result = await db.execute(
-        select(Vehicle).where(
+        update(Vehicle)
+        .where(
             Vehicle.id == vehicle_id,
             Vehicle.user_id == current_user["id"]
         )
+        .values(
+            published_platforms=case(
+                (platforms.contains(entry), Vehicle.published_platforms),
+                else_=cast(platforms.concat(entry), JSON),
+            ),
+            status="published",
+        )
+        .returning(Vehicle.id)
+        .execution_options(synchronize_session=False)
     )
-    vehicle = result.scalar_one_or_none()
     
-    if not vehicle:
+    if result.first() is None:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     
-    platforms = vehicle.published_platforms or []
-    if platform not in platforms:
-        platforms.append(platform)
-    
-    vehicle.published_platforms = platforms
-    vehicle.status = "published"
-    
     await db.commit()
     
     return {"message": f"Marked as published on {platform}"}
 
-
-# ========== HELPERS ==========
-
-def _vehicle_to_response(vehicle: Vehicle) -> VehicleResponse:
-    return VehicleResponse(
-        id=str(vehicle.id),
-        plaque=vehicle.plaque,
-        marque=vehicle.marque,
-        modele=vehicle.modele,
-        version=vehicle.version,
-        annee=vehicle.annee,
-        carburant=vehicle.carburant,
-        boite=vehicle.boite,
-        kilometrage=vehicle.kilometrage,
-        couleur=vehicle.couleur,
-        puissance=vehicle.puissance,
-        prix_estime_min=vehicle.prix_estime_min,
-        prix_estime_moyen=vehicle.prix_estime_moyen,
-        prix_estime_max=vehicle.prix_estime_max,
-        prix_choisi=vehicle.prix_choisi,
-        photos_originales=vehicle.photos_originales or [],
-        photos_traitees=vehicle.photos_traitees or [],
-        background_utilise=vehicle.background_utilise,
-        annonce_titre=vehicle.annonce_titre,
-        annonce_description=vehicle.annonce_description,
-        status=vehicle.status,
-        published_platforms=vehicle.published_platforms or [],
-        created_at=vehicle.created_at,
-        updated_at=vehicle.updated_at,
-    )
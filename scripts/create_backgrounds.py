@@ -3,35 +3,28 @@ Generate studio backgrounds for Keroxio.
 Creates solid color and gradient backgrounds.
 """
 
-from PIL import Image, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
 from pathlib import Path
 
 
 def create_gradient(size, color1, color2, direction="vertical"):
     """Create a gradient image."""
     width, height = size
-    img = Image.new("RGB", size)
-    draw = ImageDraw.Draw(img)
-    
-    r1, g1, b1 = color1
-    r2, g2, b2 = color2
+    c1 = np.array(color1, dtype=np.float64)
+    c2 = np.array(color2, dtype=np.float64)
     
+    # One colour per row (or column), then broadcast across the image
+    steps = height if direction == "vertical" else width
+    ramp = (c1 + (c2 - c1) * (np.arange(steps) / steps)[:, None]).astype(np.uint8)
     if direction == "vertical":
-        for y in range(height):
-            ratio = y / height
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-            draw.line([(0, y), (width, y)], fill=(r, g, b))
+        arr = np.broadcast_to(ramp[:, None, :], (height, width, 3))
     else:
-        for x in range(width):
-            ratio = x / width
-            r = int(r1 + (r2 - r1) * ratio)
-            g = int(g1 + (g2 - g1) * ratio)
-            b = int(b1 + (b2 - b1) * ratio)
-            draw.line([(x, 0), (x, height)], fill=(r, g, b))
+        arr = np.broadcast_to(ramp[None, :, :], (height, width, 3))
     
-    return img
+    return Image.fromarray(np.ascontiguousarray(arr))
 
 
 def add_floor_reflection(img, floor_ratio=0.3, darken=0.15):
@@ -39,78 +32,83 @@ def add_floor_reflection(img, floor_ratio=0.3, darken=0.15):
     width, height = img.size
     floor_height = int(height * floor_ratio)
     
-    # Create overlay for floor darkening
-    overlay = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    draw = ImageDraw.Draw(overlay)
-    
-    for y in range(height - floor_height, height):
-        progress = (y - (height - floor_height)) / floor_height
-        alpha = int(255 * darken * progress)
-        draw.line([(0, y), (width, y)], fill=(0, 0, 0, alpha))
+    # Black overlay whose alpha ramps up towards the bottom, blended in place
+    arr = np.array(img.convert("RGB"), dtype=np.uint16)
+    alpha = (255 * darken * (np.arange(floor_height) / floor_height)).astype(np.uint16)
+    keep = (255 - alpha)[:, None, None]
+    arr[height - floor_height:] = (arr[height - floor_height:] * keep + 127) // 255
     
-    # Composite
-    img_rgba = img.convert("RGBA")
-    result = Image.alpha_composite(img_rgba, overlay)
-    return result.convert("RGB")
+    return Image.fromarray(arr.astype(np.uint8))
 
 
-def create_backgrounds(output_dir: Path):
-    """Generate all studio backgrounds."""
-    output_dir.mkdir(parents=True, exist_ok=True)
+# Standard size (16:9 landscape)
+SIZE = (1920, 1080)
+
+BACKGROUNDS = {
+    # Studio blanc - clean white with subtle gradient
+    "studio_white": {
+        "gradient": [(255, 255, 255), (240, 240, 240)],
+        "floor": True,
+    },
+    # Studio gris - neutral grey
+    "studio_grey": {
+        "gradient": [(160, 160, 160), (100, 100, 100)],
+        "floor": True,
+    },
+    # Studio noir - premium black
+    "studio_black": {
+        "gradient": [(50, 50, 55), (15, 15, 18)],
+        "floor": True,
+    },
+    # Showroom bleu moderne
+    "showroom": {
+        "gradient": [(45, 55, 72), (25, 30, 42)],
+        "floor": True,
+    },
+    # Garage moderne - dark with warm tones
+    "garage_modern": {
+        "gradient": [(55, 50, 48), (30, 28, 26)],
+        "floor": True,
+    },
+    # Outdoor - sky gradient
+    "outdoor": {
+        "gradient": [(135, 170, 200), (200, 210, 220)],
+        "floor": False,
+    },
+}
+
+
+def _render_one(name, config, size, output_dir: Path) -> Path:
+    """Render and save a single background (runs in a worker process)."""
+    print(f"Creating {name}...")
     
-    # Standard size (16:9 landscape)
-    size = (1920, 1080)
+    # Create gradient
+    img = create_gradient(size, config["gradient"][0], config["gradient"][1])
     
-    backgrounds = {
-        # Studio blanc - clean white with subtle gradient
-        "studio_white": {
-            "gradient": [(255, 255, 255), (240, 240, 240)],
-            "floor": True,
-        },
-        # Studio gris - neutral grey
-        "studio_grey": {
-            "gradient": [(160, 160, 160), (100, 100, 100)],
-            "floor": True,
-        },
-        # Studio noir - premium black
-        "studio_black": {
-            "gradient": [(50, 50, 55), (15, 15, 18)],
-            "floor": True,
-        },
-        # Showroom bleu moderne
-        "showroom": {
-            "gradient": [(45, 55, 72), (25, 30, 42)],
-            "floor": True,
-        },
-        # Garage moderne - dark with warm tones
-        "garage_modern": {
-            "gradient": [(55, 50, 48), (30, 28, 26)],
-            "floor": True,
-        },
-        # Outdoor - sky gradient
-        "outdoor": {
-            "gradient": [(135, 170, 200), (200, 210, 220)],
-            "floor": False,
-        },
-    }
+    # Add floor effect if specified
+    if config.get("floor"):
+        img = add_floor_reflection(img)
     
-    created = []
+    # Save
+    filepath = output_dir / f"{name}.jpg"
+    img.save(filepath, "JPEG", quality=95)
+    print(f"  OK: {filepath}")
+    return filepath
+
+
+def create_backgrounds(output_dir: Path):
+    """Generate all studio backgrounds, in parallel across processes."""
+    output_dir.mkdir(parents=True, exist_ok=True)
     
-    for name, config in backgrounds.items():
-        print(f"Creating {name}...")
-        
-        # Create gradient
-        img = create_gradient(size, config["gradient"][0], config["gradient"][1])
-        
-        # Add floor effect if specified
-        if config.get("floor"):
-            img = add_floor_reflection(img)
-        
-        # Save
-        filepath = output_dir / f"{name}.jpg"
-        img.save(filepath, "JPEG", quality=95)
-        created.append(filepath)
-        print(f"  OK: {filepath}")
+    n = len(BACKGROUNDS)
+    with ProcessPoolExecutor() as executor:
+        created = list(executor.map(
+            _render_one,
+            BACKGROUNDS.keys(),
+            BACKGROUNDS.values(),
+            [SIZE] * n,
+            [output_dir] * n,
+        ))
     
     return created
 